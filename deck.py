@@ -7,7 +7,7 @@ A test example for STF
 # Imports
 import random
 from enum import Enum, auto
-from typing import Any, Iterable
+from typing import Any, Iterable, Optional, cast
 
 import stf
 
@@ -17,6 +17,10 @@ class Card(stf.STFObject):
     A card object
     """
 
+    __slots__ = ("suit", "rank")
+    suit: "Card.Suit"
+    rank: "Card.Rank"
+
     def metadata(self) -> stf.ByteStream:
         """
         Gets metadata
@@ -25,6 +29,9 @@ class Card(stf.STFObject):
         return stf.ByteStream()
 
     requires_header = False
+    pack_format = "B"
+    # Cards never change, decks of them don't have to check
+    immutable = True
 
     class Suit(Enum):
         """
@@ -41,7 +48,7 @@ class Card(stf.STFObject):
             """
             Gets a random suit
             """
-            return Card.Suit(random.randint(0, 3))
+            return random.choice(Card.SUITS)
 
     class Rank(Enum):
         """
@@ -67,11 +74,22 @@ class Card(stf.STFObject):
             """
             Gets a random card rank
             """
-            return Card.Rank(random.randint(0, 13))
+            return random.choice(Card.RANKS)
+
+    # Lookup tables filled in by build_tables, cards are immutable so deserialized ones are shared
+    _DECODE: list[Optional["Card"]] = []
+    _ENCODE: dict[tuple[Suit, Rank], int] = {}
+    _ALL: tuple["Card", ...] = ()
+    # Every member, built once so get_random samples a tuple instead of turning the Enum into a sequence each call
+    SUITS: tuple[Suit, ...] = tuple(Suit)
+    RANKS: tuple[Rank, ...] = tuple(Rank)
 
     def __init__(self, suit: Suit, rank: Rank) -> None:
-        self.suit = suit
-        self.rank = rank
+        object.__setattr__(self, "suit", suit)
+        object.__setattr__(self, "rank", rank)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Cards are immutable")
 
     def __str__(self) -> str:
         return f"{self.rank.name} of {self.suit.name}"
@@ -99,29 +117,64 @@ class Card(stf.STFObject):
         """
         Deserializes a card
         """
-        value = data.read_int(length=1)
-        _suit, _rank = stf.Utility.decode_nibbles(value)
-        suit = Card.Suit(_suit)
-        rank = Card.Rank(_rank)
-        return Card(suit, rank)
+        return cls.from_packed((data.read_int(1),))
+
+    @classmethod
+    def from_packed(cls, values: tuple[int, ...]) -> "Card":
+        """
+        Looks the card up from its byte
+        """
+        card = Card._DECODE[values[0]]
+        if card is None:
+            raise ValueError(f"{values[0]:#04x} is not a valid card")
+        return card
 
     def data(self, *_: Any, **__: Any) -> stf.ByteStream:
         """
         Gets the data for serialization
         """
         result = stf.ByteStream()
-        value = stf.Utility.encode_nibbles(self.suit.value, self.rank.value)
+        (value,) = self.pack_values()
         result.add_obj(value, length=1)
         return result
 
+    def pack_values(self) -> tuple[int, ...]:
+        """
+        Suit and rank share a byte
+        """
+        return (Card._ENCODE[(self.suit, self.rank)],)
+
     @classmethod
     def get_all(cls) -> Iterable["Card"]:
         """
         Get all cards
         """
-        for suit in Card.Suit:
-            for rank in Card.Rank:
-                yield Card(suit, rank)
+        return iter(Card._ALL)
+
+    @classmethod
+    def all_cards(cls) -> tuple["Card", ...]:
+        """
+        Gets the shared tuple of every card
+        """
+        return Card._ALL
+
+    @classmethod
+    def build_tables(cls) -> None:
+        """
+        Fills in the lookup tables, called once the class exists
+        """
+        # Suit and rank are packed as nibbles
+        assert len(cls.Suit) <= 16 and len(cls.Rank) <= 16
+        cls._DECODE = [None] * 256
+        for suit in cls.SUITS:
+            for rank in cls.RANKS:
+                value = stf.Utility.encode_nibbles(suit.value, rank.value)
+                cls._ENCODE[(suit, rank)] = value
+                cls._DECODE[value] = cls(suit, rank)
+        cls._ALL = tuple(cast(Card, cls._DECODE[value]) for value in cls._ENCODE.values())
+
+
+Card.build_tables()
 
 
 # pylint: disable=too-few-public-methods
@@ -139,9 +192,8 @@ class Deck(stf.STFArray[Card]):  # type: ignore
         """
         Gets a random deck
         """
-        deck = list(Card.get_all())
-        random.shuffle(deck)
-        return Deck(deck)
+        cards = Card.all_cards()
+        return Deck(random.sample(cards, len(cards)))
 
 
 def main() -> None:
@@ -6,178 +6,204 @@ base.py
 
 # Imports
 import hashlib
+import mmap
+import struct
+import zlib
 from abc import ABC, abstractmethod
+from itertools import chain
+from operator import attrgetter
 from types import TracebackType
-from typing import Any, BinaryIO, Generic, Iterable, List, Literal, NamedTuple, Optional, Self, Type, TypeVar, Union, cast
+from typing import Any, BinaryIO, Callable, Generic, Iterable, Iterator, List, Literal, NamedTuple, Optional, Self, Sequence, Type, TypeVar, Union, cast
+
+from stf.configuration import Configuration
+from stf.exceptions import STFBaseException, STFCriticalException, STFNonCriticalException, STFUnboundStringException, STFOverRead, STFMagicNumberException, STFVersionException, STFInvalidTypeException
+from stf.utility import Utility
 
 __all__ = ["STFBaseException", "STFCriticalException", "STFNonCriticalException", "STFUnboundStringException", "STFOverRead", "STFMagicNumberException", "STFVersionException", "STFInvalidTypeException", "Configuration", "Utility",
            "STFObject", "STFArray", "ByteStream", "SerializedTreeFile", "Convertable", "ByteSequence"]
 
-from typing_extensions import SupportsIndex
-
-
-class STFBaseException(Exception, ABC):
-    """
-    Base for the entire hierarchy of exceptions
-    """
-
-
-class STFNonCriticalException(STFBaseException, ABC):
-    """
-    Base for fixable errors
-    """
-
-
-class STFCriticalException(STFBaseException, ABC):
-    """
-    Base for severe errors
-    """
-
-
-class STFMagicNumberException(STFCriticalException):
-    """
-    Indicates bad magic number
-    """
 
+# struct codes of the unsigned int widths struct supports natively
+_INT_CODES = {1: "B", 2: "H", 4: "I", 8: "Q"}
+# Precompiled packers for those widths, keyed by (length, byteorder, signed)
+_PACKERS: dict[tuple[int, str, bool], struct.Struct] = {
+    (length, byteorder, signed): struct.Struct(Utility.struct_byteorder(byteorder) + (code.lower() if signed else code))
+    for length, code in _INT_CODES.items()
+    for byteorder in ("little", "big")
+    for signed in (False, True)
+}
 
-class STFVersionException(STFCriticalException):
-    """
-    Indicates wrong version
-    """
-
-
-class STFUnboundStringException(STFCriticalException):
-    """
-    Unterminated String
-    """
+Convertable = Union[bool, int, str, "STFObject"]
+ConvertableTypes = Union[type[bool], type[int], type[str], type["STFObject"]]
+# Anything a ByteStream can read in place, only bytearrays are ever written to
+Buffer = Union[bytearray, bytes, mmap.mmap]
+ByteSequence = Union[bytes, str, bytearray, memoryview, "ByteStream"]
 
 
-class STFOverRead(STFCriticalException):
+# pylint: disable=too-many-public-methods
+class ByteStream:
     """
-    Read too many bytes
+    Window over a shared bytearray that implements convenient
+    methods for adding/reading values from a binary array
     """
 
+    __slots__ = ("_buf", "_start", "_end", "_pos", "_source")
 
-class STFInvalidTypeException(STFCriticalException):
-    """
-    Invalid type for operation
-    """
-
+    def __init__(self, data: ByteSequence = b"", initial_position: int = 0) -> None:
+        """
+        Initializer, copies 'data' in a single step
+        """
+        self._buf: Buffer = bytearray(ByteStream._as_buffer(data))
+        self._start: int = 0
+        self._end: int = len(self._buf)
+        self._pos: int = initial_position
+        # File that unread bytes are pulled from on demand
+        self._source: Optional[BinaryIO] = None
 
-# pylint: disable=too-few-public-methods
-class Configuration:
-    """
-    Stores relevant constants for the program, I hate magic numbers
-    """
-    # Default length of boolean values in bytes
-    BOOL_LENGTH: int = 1
-    # Maximum length of metadata in bytes
-    METADATA_LENGTH: int = 3
-    # Default string encoding
-    ENCODING: str = "utf-8"
-    # Whether to zero terminate strings
-    ZERO_TERMINATE: bool = True
-    # Maximum size of a subfield in bytes
-    MAX_FIELD_SIZE: int = 4
-    # Parity of data
-    ENDIANNESS: Literal["little", "big"] = "big"
-    # Size of ints in bytes
-    INT_SIZE: int = 8
-    # Magic number for validation
-    MAGIC: int = 0xDEADBEEF
-    # Version
-    VERSION: int = 0x00000004
-
-
-class Utility:
-    """
-    Stores utility functions
-    """
+    @classmethod
+    def from_file(cls, file: BinaryIO) -> "ByteStream":
+        """
+        Creates a stream that reads from 'file' as bytes are needed instead of loading it up front
+        """
+        stream = cls()
+        stream._source = file
+        return stream
 
-    @staticmethod
-    def mask_bits(length: int) -> int:
+    @classmethod
+    def from_buffer(cls, buffer: Buffer, start: int = 0) -> "ByteStream":
         """
-        Filters the lower 'length' bits of an int
+        Reads 'buffer' in place from 'start', e.g. an mmap, writing to the stream copies it first
         """
-        return (1 << length) - 1
+        return cls._window(buffer, start, len(buffer))
 
-    @staticmethod
-    def version_validation(version: int) -> bool:
+    def _fill(self, size: int = -1) -> None:
         """
-        Checks if versions are compatible
+        Pulls at least 'size' more bytes from the source file, -1 pulls everything
         """
-        return version == Configuration.VERSION
+        if self._source is None:
+            return
+        chunk = self._source.read(max(size, Configuration.FILE_CHUNK_SIZE) if size >= 0 else -1)
+        if size < 0 or len(chunk) < size:
+            # Hit the end of the file
+            self._source = None
+        cast(bytearray, self._buf).extend(chunk)
+        self._end = len(self._buf)
 
-    @staticmethod
-    def encode_nibbles(first: int, second: int) -> int:
+    @classmethod
+    def _window(cls, buffer: Buffer, start: int, end: int) -> "ByteStream":
         """
-        Sticks two small ints into a byte
+        Creates a stream sharing 'buffer' between 'start' and 'end' without copying
         """
-        return ((first & 0x0F) << 4) | (second & 0x0F)
+        view = cls.__new__(cls)
+        view._buf = buffer
+        view._start = start
+        view._end = end
+        view._pos = start
+        view._source = None
+        return view
 
     @staticmethod
-    def decode_nibbles(num: int) -> tuple[int, int]:
+    def _as_buffer(data: ByteSequence) -> Union[bytes, bytearray, memoryview]:
         """
-        Pulls two small ints out of a byte
+        Gets something the buffer protocol understands from a ByteSequence
         """
-        return (num & 0xF0) >> 4, num & 0x0F
+        if isinstance(data, ByteStream):
+            return ByteStream._memoryview(data)
+        if isinstance(data, str):
+            return data.encode(Configuration.ENCODING)
+        return data
 
+    def _memoryview(self) -> memoryview:
+        """
+        Zero-copy view of the bytes in this stream
+        """
+        return memoryview(self._buf)[self._start:self._end]
 
-Convertable = Union[bool, int, str, "STFObject"]
-ConvertableTypes = Union[type[bool], type[int], type[str], type["STFObject"]]
-ByteSequence = Union[bytes, str, bytearray]
-
+    def view(self) -> "ByteStream":
+        """
+        Zero-copy stream over the same bytes with its own cursor, writing to it leaves this stream untouched
+        """
+        return ByteStream._window(self._buf, self._start, self._end)
 
-class ByteStream(bytearray):
-    """
-    Subclass of the default bytearray that implements convenient
-    methods for adding/reading values from a binary array
-    """
+    @classmethod
+    def concat(cls, *parts: ByteSequence) -> "ByteStream":
+        """
+        Joins several byte sequences into a new stream with a single allocation
+        """
+        buffer = bytearray().join(ByteStream._as_buffer(part) for part in parts)
+        return cls._window(buffer, 0, len(buffer))
 
-    def __init__(self, initial_position: int = 0, old_array: Optional[ByteSequence] = None) -> None:
+    def write_to(self, file: BinaryIO) -> None:
         """
-        Initializer
+        Writes the bytes to a file without copying them
         """
-        super().__init__()
-        if old_array:
-            # If a bytearray is passed, copy its data
-            self.extend(cast(bytearray, old_array))
-        self.__position: int = initial_position
-        # self.__sub_position: int = 0
+        file.write(self._memoryview())
 
     def get_bytes(self) -> bytes:
         """
         Converts the ByteStream to bytes
         """
-        return bytes(self)
+        return bytes(self._memoryview())
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __bytes__(self) -> bytes:
+        return self.get_bytes()
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._memoryview())
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[int, bytes]:
+        if isinstance(item, slice):
+            return bytes(self._memoryview()[item])
+        return self._memoryview()[item]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ByteStream):
+            return self._memoryview() == other._memoryview()
+        if isinstance(other, (bytes, bytearray, memoryview)):
+            return self._memoryview() == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return f"ByteStream({self.get_bytes()!r})"
 
     @property
     def position(self) -> int:
         """
         Current position in stream
         """
-        return self.__position
+        return self._pos - self._start
 
     @property
     def remaining(self) -> "ByteStream":
         """
         Unread bytes
         """
-        return ByteStream(old_array=self[self.__position:])
+        if self._source is not None:
+            self._fill()
+        return self._slice(self._pos, self._end)
 
     @property
     def length(self) -> int:
         """
         Gets length of data
         """
-        return len(self)
+        if self._source is not None:
+            self._fill()
+        return self._end - self._start
 
     @property
     def remaining_length(self) -> int:
         """
         Length of unread segment
         """
-        return self.length - self.__position
+        if self._source is not None:
+            self._fill()
+        return self._end - self._pos
 
     def read(self, length: int = 0) -> "ByteStream":
         """
@@ -185,13 +211,31 @@ class ByteStream(bytearray):
         """
         if length <= 0:
             return ByteStream()
-        new_position = self.__position + length
+        start = self._advance(length)
+        return self._slice(start, self._pos)
+
+    def _slice(self, start: int, end: int) -> "ByteStream":
+        """
+        Stream over the bytes between 'start' and 'end', copied out of mmaps so it outlives the file
+        """
+        if isinstance(self._buf, mmap.mmap):
+            copied = self._buf[start:end]
+            return ByteStream._window(copied, 0, len(copied))
+        return ByteStream._window(self._buf, start, end)
+
+    def _advance(self, length: int) -> int:
+        """
+        Moves the cursor forward, returning where it was
+        """
+        start = self._pos
+        new_position = start + length
         # Check for over-read
-        if new_position > self.length:
-            raise STFOverRead(f"Read beyond length of data. Attempted to read {length} bytes starting at {self.position}, {new_position} > {self.length}")
-        new_segment = ByteStream(old_array=self[self.__position: new_position])
-        self.__position = new_position
-        return new_segment
+        if new_position > self._end and self._source is not None:
+            self._fill(new_position - self._end)
+        if new_position > self._end:
+            raise STFOverRead(f"Read beyond length of data. Attempted to read {length} bytes starting at {self.position}, {new_position - self._start} > {self.length}")
+        self._pos = new_position
+        return start
 
     def read_int(
             self,
@@ -202,34 +246,97 @@ class ByteStream(bytearray):
         """
         Reads an integer
         """
-        return int.from_bytes(bytes=self.read(length), byteorder=byteorder, signed=signed)
+        start = self._advance(length)
+        packer = _PACKERS.get((length, byteorder, signed))
+        if packer is not None:
+            value: int = packer.unpack_from(self._buf, start)[0]
+            return value
+        return int.from_bytes(self._buf[start:self._pos], byteorder, signed=signed)
 
     def read_str(self, length: int = 0, encoding: str = Configuration.ENCODING) -> str:
         """
         Reads a string, zero terminated or not
         """
         if length > 0:
-            return self.read(length).decode(encoding=encoding)
-        try:
-            zero_index = self.index(0x00, self.__position) - self.__position
-        except ValueError as _:
-            raise STFUnboundStringException from _
-        result = self.read_str(zero_index)
-        # Ignore zero
-        self.read(1)
+            start = self._advance(length)
+            return self._buf[start:self._pos].decode(encoding=encoding)
+        zero_index = self._buf.find(b"\x00", self._pos, self._end)
+        while zero_index < 0 and self._source is not None:
+            searched = self._end
+            self._fill(Configuration.FILE_CHUNK_SIZE)
+            zero_index = self._buf.find(b"\x00", searched, self._end)
+        if zero_index < 0:
+            raise STFUnboundStringException()
+        result = self._buf[self._pos:zero_index].decode(encoding=encoding)
+        # Skip past the zero
+        self._pos = zero_index + 1
         return result
 
+    def read_ints(
+            self,
+            count: int,
+            length: int = Configuration.INT_SIZE,
+            byteorder: Literal["little", "big"] = Configuration.ENDIANNESS,
+            signed: bool = False
+    ) -> List[int]:
+        """
+        Reads 'count' consecutive integers, in one struct call for the widths struct supports
+        """
+        packer = _PACKERS.get((length, byteorder, signed))
+        if packer is None:
+            return [self.read_int(length, byteorder, signed) for _ in range(count)]
+        start = self._advance(length * count)
+        return list(struct.unpack_from(f"{packer.format[0]}{count}{packer.format[1:]}", self._buf, start))
+
+    def read_packed(
+            self,
+            pack_format: str,
+            count: int = 1,
+            byteorder: Literal["little", "big"] = Configuration.ENDIANNESS
+    ) -> Iterator[tuple[Any, ...]]:
+        """
+        Reads 'count' consecutive records laid out as the struct format 'pack_format'
+        """
+        packer = struct.Struct(Utility.struct_byteorder(byteorder) + pack_format)
+        start = self._advance(packer.size * count)
+        return packer.iter_unpack(self._buf[start:self._pos])
+
+    def read_struct(self, packer: struct.Struct) -> tuple[Any, ...]:
+        """
+        Reads one record laid out as 'packer'
+        """
+        return packer.unpack_from(self._buf, self._advance(packer.size))
+
     def read_bool(self) -> bool:
         """
         Reads a bool
         """
-        return bool(self.read(1))
+        return self._buf[self._advance(1)] != 0
 
     def write(self, data: ByteSequence) -> None:
         """
         Writes bytes
         """
-        self.extend(cast(Iterable[SupportsIndex], data))
+        buffer = self._writable()
+        source = ByteStream._as_buffer(data)
+        if isinstance(source, memoryview) and source.obj is buffer:
+            # A live view would pin the buffer against resizing
+            source = bytes(source)
+        buffer.extend(source)
+        self._end = len(buffer)
+
+    def _writable(self) -> bytearray:
+        """
+        Gets the buffer ready for appending
+        """
+        if self._end != len(self._buf) or self._buf.__class__ is not bytearray:
+            # Another stream owns the bytes past our end or the buffer is read only, take a private copy before appending
+            self._buf = bytearray(self._memoryview())
+            self._pos -= self._start
+            self._start, self._end = 0, len(self._buf)
+        return self._buf
+
+    extend = write
 
     def add_obj(self, obj: Convertable, *args: Any, **kwargs: Any) -> None:
         """
@@ -247,7 +354,39 @@ class ByteStream(bytearray):
         """
         Writes an int
         """
-        self.write(value.to_bytes(length=length, byteorder=byteorder, signed=signed))
+        packer = _PACKERS.get((length, byteorder, signed))
+        if packer is None:
+            self.write(value.to_bytes(length, byteorder, signed=signed))
+            return
+        try:
+            packed = packer.pack(value)
+        except struct.error as _:
+            raise OverflowError(f"int {value} does not fit in {length} bytes") from _
+        # Packed bytes can't alias the buffer, skip write's checks
+        self._writable().extend(packed)
+        self._end += length
+
+    def write_ints(
+            self,
+            values: Sequence[int],
+            byteorder: Literal["little", "big"] = Configuration.ENDIANNESS,
+            length: int = Configuration.INT_SIZE,
+            signed: bool = False
+    ) -> None:
+        """
+        Writes consecutive integers, in one struct call for the widths struct supports
+        """
+        packer = _PACKERS.get((length, byteorder, signed))
+        if packer is None:
+            for value in values:
+                self.write_int(value, byteorder, length, signed)
+            return
+        try:
+            packed = struct.pack(f"{packer.format[0]}{len(values)}{packer.format[1:]}", *values)
+        except struct.error as _:
+            raise OverflowError(f"ints do not fit in {length} bytes") from _
+        self._writable().extend(packed)
+        self._end += len(packed)
 
     def write_str(
             self,
@@ -258,9 +397,13 @@ class ByteStream(bytearray):
         """
         Writes string
         """
+        # Encoded bytes can't alias the buffer, skip write's checks
+        buffer = self._writable()
+        buffer += value.encode(encoding)
         if zero_terminated:
-            value += "\0"
-        self.write(value.encode(encoding))
+            # Appending the terminator saves copying the string to add it
+            buffer.append(0)
+        self._end = len(buffer)
 
     def write_bool(
             self,
@@ -272,63 +415,150 @@ class ByteStream(bytearray):
         """
         Writes a bool
         """
-        self.write_int(value=value, length=length, byteorder=byteorder, signed=signed)
+        self.write_int(value, byteorder, length, signed)
 
     # noinspection InsecureHash
     def hash(self) -> int:
         """
-        Gets the sha256 hash of the ByteStream
+        Gets the checksum of the ByteStream, crc32 or sha256 depending on Configuration.STRONG_HASH
         """
-        hasher = hashlib.sha256()
-        hasher.update(self)
-        digest = hasher.digest()
-        hashed = int.from_bytes(digest, Configuration.ENDIANNESS) & Utility.mask_bits(Configuration.INT_SIZE * 8)
-        return hashed
+        if not Configuration.STRONG_HASH:
+            return zlib.crc32(self._memoryview())
+        digest = hashlib.sha256(self._memoryview(), usedforsecurity=False).digest()
+        # Only the low INT_SIZE bytes are kept, which sit at the end of a big endian digest
+        if Configuration.ENDIANNESS == "big":
+            return int.from_bytes(digest[-Configuration.INT_SIZE:], "big")
+        return int.from_bytes(digest[:Configuration.INT_SIZE], "little")
 
     @classmethod
     def convert(cls, item: Convertable, *args: Any, **kwargs: Any) -> "ByteStream":
         """
         Converts a miscellaneous data type to bytes
         """
-        result = ByteStream()
-        if isinstance(item, STFObject):
-            result.write(item.serialize())
-        elif isinstance(item, int):
-            result.write_int(item, *args, **kwargs)
-        elif isinstance(item, str):
-            result.write_str(item, *args, **kwargs)
-        elif isinstance(item, bool):
-            result.write_bool(item, *args, **kwargs)
-        else:
-            raise STFInvalidTypeException(f"Unknown type {type(item).__name__}")
-        return result
+        writer = _WRITERS.get(type(item)) or _writer_for(type(item))
+        return writer(item, *args, **kwargs)
 
     def deconvert(self, target_type: ConvertableTypes, *args: Any, **kwargs: Any) -> Convertable:
         """
         Converts bytes to a type
         """
-        if issubclass(target_type, STFObject):
-            return target_type.deserialize(self)
-        if issubclass(target_type, int):
-            return self.read_int(*args, **kwargs)
-        if issubclass(target_type, str):
-            return self.read_str(*args, **kwargs)
-        if issubclass(target_type, bool):
-            return self.read_bool()
-        raise STFInvalidTypeException(f"Unknown type {target_type.__name__}")
+        reader = _READERS.get(target_type) or _reader_for(target_type)
+        return reader(self, *args, **kwargs)
 
     def display(self, width: int = 8, index_start: int = 0) -> str:
         """
         Prints a hex dump of the bytes
         """
-        result = str()
-        for index, byte in enumerate(self[index_start:]):
-            result += f"{byte:02x} "
-            if index % width == width - 1:
-                result += "\n"
+        data = self._memoryview()[index_start:]
+        if not data:
+            return str()
+        # Every byte takes 3 characters, "xx "
+        hexed = data.hex(" ") + " "
+        step = width * 3
+        result = "\n".join(hexed[index:index + step] for index in range(0, len(hexed), step))
+        if len(data) % width == 0:
+            result += "\n"
         return result
 
 
+def _writing(method: Callable[..., None]) -> Callable[..., ByteStream]:
+    """
+    Turns a ByteStream write method into a function returning a new stream holding what it wrote
+    """
+
+    def writer(item: Convertable, *args: Any, **kwargs: Any) -> ByteStream:
+        result = ByteStream()
+        method(result, item, *args, **kwargs)
+        return result
+
+    return writer
+
+
+# convert/deconvert handlers by exact type, filled in as types are first seen
+_WRITERS: dict[type, Callable[..., ByteStream]] = {}
+_READERS: dict[type, Callable[..., Convertable]] = {}
+
+
+def _writer_for(item_type: type) -> Callable[..., ByteStream]:
+    """
+    Picks the function convert uses for a type, remembered so later items of the type skip the isinstance checks
+    """
+    writer: Callable[..., ByteStream]
+    if issubclass(item_type, STFObject):
+        def writer(item: STFObject, *_: Any, **__: Any) -> ByteStream:
+            # serialize already hands back a stream of its own
+            return item.serialize()
+    # bool is an int, it has to be checked first
+    elif issubclass(item_type, bool):
+        writer = _writing(ByteStream.write_bool)
+    elif issubclass(item_type, int):
+        writer = _writing(ByteStream.write_int)
+    elif issubclass(item_type, str):
+        writer = _writing(ByteStream.write_str)
+    else:
+        raise STFInvalidTypeException(f"Unknown type {item_type.__name__}")
+    _WRITERS[item_type] = writer
+    return writer
+
+
+def _reader_for(target_type: ConvertableTypes) -> Callable[..., Convertable]:
+    """
+    Picks the function deconvert uses for a type, remembered so later reads of the type skip the issubclass checks
+    """
+    reader: Callable[..., Convertable]
+    if issubclass(target_type, STFObject):
+        deserialize = target_type.deserialize
+
+        def reader(data: ByteStream, *_: Any, **__: Any) -> Convertable:
+            return deserialize(data)
+    # bool is an int, it has to be checked first
+    elif issubclass(target_type, bool):
+        def reader(data: ByteStream, *_: Any, **__: Any) -> Convertable:
+            return data.read_bool()
+    elif issubclass(target_type, int):
+        reader = ByteStream.read_int
+    elif issubclass(target_type, str):
+        reader = ByteStream.read_str
+    else:
+        raise STFInvalidTypeException(f"Unknown type {target_type.__name__}")
+    _READERS[target_type] = reader
+    return reader
+
+
+# Structs for the fixed part of headers, keyed by (max_field_size, max_metadata_size, has_metadata)
+_HEADERS: dict[tuple[int, int, bool], struct.Struct] = {}
+
+
+def _header_struct(field_size: int, metadata_size: int, has_metadata: bool) -> struct.Struct:
+    """
+    Gets the struct for a header's hash, size and metadata length, widths struct doesn't support are raw bytes
+    """
+    key = (field_size, metadata_size, has_metadata)
+    if key not in _HEADERS:
+        widths = (Configuration.INT_SIZE, field_size) + ((metadata_size,) if has_metadata else ())
+        layout = "".join(_INT_CODES.get(width, f"{width}s") for width in widths)
+        _HEADERS[key] = struct.Struct(Utility.struct_byteorder() + layout)
+    return _HEADERS[key]
+
+
+def _to_field(value: int, width: int) -> Union[int, bytes]:
+    """
+    Gets what _header_struct packs for an int field of 'width' bytes
+    """
+    return value if width in _INT_CODES else value.to_bytes(width, Configuration.ENDIANNESS)
+
+
+def _from_field(value: Union[int, bytes]) -> int:
+    """
+    Gets the int back from a field _header_struct unpacked
+    """
+    return value if isinstance(value, int) else int.from_bytes(value, Configuration.ENDIANNESS)
+
+
+# Magic number and version at the start of every object in a file
+_FILE_HEADER = struct.Struct(Utility.struct_byteorder() + "II")
+
+
 class Header(NamedTuple):
     """
     Simple container for header info
@@ -346,45 +576,146 @@ class STFObject(ABC):
     max_metadata_size: int = 3
     requires_header: bool = True
     has_metadata: bool = True
+    # struct format of the data for fixed width objects, lets STFArray pack headerless elements in one call
+    pack_format: Optional[str] = None
+    # Lets serialize() and header() cache the bytes, only set it when assigning attributes (or calling invalidate()) is the
+    # only way the data can change, e.g. not when data() serializes a child object that can be changed on its own
+    cacheable: bool = False
+    # Instances never change after they are created, arrays of them skip checking their elements for changes
+    immutable: bool = False
+
+    # Lets subclasses go without a __dict__
+    __slots__ = ()
+    # Whether instances keep their serialization, cacheable classes whose instances have no __dict__ to keep it in don't
+    _caches: bool = False
+    # Nothing is cached until the instance stores its own
+    _cached_data: Optional[ByteStream] = None
+    _cached_header: Optional[ByteStream] = None
+    # Bumped on every invalidation, lets containers tell whether a child changed since they cached it
+    _cache_version: int = 0
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """
+        Works out whether instances can cache their serialization, and checks the packing hooks exist for pack_format
+        """
+        super().__init_subclass__(**kwargs)
+        cls._caches = cls.cacheable and cls.__dictoffset__ != 0
+        if cls.pack_format is not None:
+            missing = [name for name in ("pack_values", "from_packed") if not any(name in vars(base) for base in cls.__mro__ if base is not STFObject)]
+            if missing:
+                raise STFInvalidTypeException(f"{cls.__name__} sets pack_format but does not implement {' or '.join(missing)}")
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """
+        Any change to the object makes the cached serialization stale
+        """
+        self.invalidate()
+        super().__setattr__(name, value)
+
+    def invalidate(self) -> None:
+        """
+        Drops the cached data and header, call this after mutating the object in a way __setattr__ can't see
+        """
+        if not self._caches:
+            return
+        object.__setattr__(self, "_cached_data", None)
+        object.__setattr__(self, "_cached_header", None)
+        object.__setattr__(self, "_cache_version", self._cache_version + 1)
+
+    def _refresh_cache(self) -> None:
+        """
+        Invalidates the cache if something it was built from changed, objects without children have nothing to check
+        """
+
+    def _cache_filled(self) -> None:
+        """
+        Called when data() was just cached, objects without children have nothing to remember
+        """
+
+    def _get_data(self) -> ByteStream:
+        """
+        Gets data, only calling data() again when the object has changed
+        """
+        if self._cached_data is None:
+            object.__setattr__(self, "_cached_data", self.data())
+            self._cache_filled()
+        return cast(ByteStream, self._cached_data).view()
+
+    def _get_header(self) -> ByteStream:
+        """
+        Gets the header for data(), only rebuilding it when the object has changed
+        """
+        if self._cached_header is None:
+            object.__setattr__(self, "_cached_header", self._header_for(self._get_data()))
+        return cast(ByteStream, self._cached_header).view()
+
+    def _parts(self, *args: Any, **kwargs: Any) -> tuple[Optional[ByteStream], ByteStream]:
+        """
+        Gets the header, None when it isn't required, and the data to serialize
+        """
+        if args or kwargs or not self._caches:
+            # Arguments can change the data, so neither part comes from the cache
+            data = self.data(*args, **kwargs)
+            return (self._header_for(data) if self.requires_header else None), data
+        self._refresh_cache()
+        return (self._get_header() if self.requires_header else None), self._get_data()
 
     def serialize(self, *args: Any, **kwargs: Any) -> ByteStream:
         """
         Gets a binary representation of the object
         """
-        result = ByteStream()
-        if self.requires_header:
-            result.write(self.header())
-        result.write(self.data(*args, **kwargs))
-        return result
+        header, data = self._parts(*args, **kwargs)
+        if header is not None:
+            return ByteStream.concat(header, data)
+        # data() can hand back a stream the object still holds, a view keeps writes to the result out of it
+        return data.view()
 
-    def header(self) -> ByteStream:
+    def serialize_into(self, file: BinaryIO, *args: Any, **kwargs: Any) -> None:
         """
-        Gets the header from data
+        Writes the binary representation straight to a file without joining it into one stream first
         """
-        result = ByteStream()
-        data = self.data()
-        result.add_obj(data.hash())
-        result.add_obj(data.length, length=self.max_field_size)
-        #
+        header, data = self._parts(*args, **kwargs)
+        if header is not None:
+            header.write_to(file)
+        data.write_to(file)
+
+    def header(self, data: Optional[ByteStream] = None) -> ByteStream:
+        """
+        Gets the header for already computed data, or for data() when it isn't passed
+        """
+        if data is not None:
+            return self._header_for(data)
+        if not self._caches:
+            return self._header_for(self.data())
+        self._refresh_cache()
+        return self._get_header()
+
+    def _header_for(self, data: ByteStream) -> ByteStream:
+        """
+        Builds the header describing 'data'
+        """
+        packer = _header_struct(self.max_field_size, self.max_metadata_size, self.has_metadata)
+        fields = [_to_field(data.hash(), Configuration.INT_SIZE), _to_field(data.length, self.max_field_size)]
+        metadata = ByteStream()
         if self.has_metadata:
-            metadata: ByteStream = self.metadata()
-            result.add_obj(metadata.length, length=self.max_metadata_size)
-            result.extend(metadata)
-        return result
+            metadata = self.metadata()
+            fields.append(_to_field(metadata.length, self.max_metadata_size))
+        try:
+            fixed = packer.pack(*fields)
+        except struct.error as _:
+            raise OverflowError(f"data of {data.length} bytes does not fit in {self.max_field_size} bytes") from _
+        return ByteStream.concat(fixed, metadata)
 
     @classmethod
     def read_header(cls, data: ByteStream) -> Header:
         """
         Gets header from data
         """
-
-        hashed: int = data.read_int()
-        size: int = data.read_int(length=cls.max_field_size)
-        metadata: ByteStream = ByteStream()
-        if cls.has_metadata:
-            metadata_length: int = data.read_int(length=cls.max_metadata_size)
-            metadata = data.read(length=metadata_length)
-        return Header(hashed, size, metadata)
+        packer = _header_struct(cls.max_field_size, cls.max_metadata_size, cls.has_metadata)
+        fields = data.read_struct(packer)
+        # A fresh stream each time, the default is shared by every header
+        metadata = data.read(_from_field(fields[2])) if cls.has_metadata else ByteStream()
+        return Header(_from_field(fields[0]), _from_field(fields[1]), metadata)
 
     @classmethod
     @abstractmethod
@@ -396,7 +727,7 @@ class STFObject(ABC):
     @abstractmethod
     def data(self, *args: Any, **kwargs: Any) -> ByteStream:
         """
-        Gets bytes of data
+        Gets bytes of data, serialize() and header() cache the result until the object changes for cacheable classes
         """
 
     @abstractmethod
@@ -405,16 +736,78 @@ class STFObject(ABC):
         Gets metadata
         """
 
+    def pack_values(self) -> tuple[int, ...]:
+        """
+        Values that pack_format packs into the same bytes as data()
+        """
+        raise STFInvalidTypeException(f"{type(self).__name__} has no pack_format")
+
+    @classmethod
+    def from_packed(cls, values: tuple[int, ...]) -> "STFObject":
+        """
+        Inverse of pack_values, builds the object from values unpacked with pack_format
+        """
+        raise STFInvalidTypeException(f"{cls.__name__} has no pack_format")
+
 
 T = TypeVar("T", bool, int, str, STFObject)
 
 
+# Keyword arguments the bulk int paths understand
+_INT_OPTIONS = frozenset(("length", "byteorder", "signed"))
+# Read once like the ByteStream defaults, so arrays always encode their elements the way single values are
+_BOOL_LENGTH = Configuration.BOOL_LENGTH
+_ZERO_TERMINATE = Configuration.ZERO_TERMINATE
+_ENCODING = Configuration.ENCODING
+_cache_version = attrgetter("_cache_version")
+# Elements that neither cache nor are immutable never bump their version
+_keeps_version = attrgetter("_caches", "immutable")
+
+
+def _invalidating(method: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wraps a list mutator so it drops the array's cached serialization first
+    """
+
+    def wrapper(self: STFObject, *args: Any) -> Any:
+        self.invalidate()
+        return method(self, *args)
+
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
 class STFArray(Generic[T], List[T], STFObject, ABC):
     """
     Stores multiple of a single type
     """
 
     max_elem_field_width: int = 2
+    # Element reader resolved once per subclass, saves dispatching on the element type for every element
+    _read_element: Optional[Callable[..., Convertable]] = None
+    # Element cache versions when data was last computed, None unless elements are STFObjects
+    _child_versions: Optional[List[int]] = None
+
+    # Mutating the list changes the data
+    append = _invalidating(list.append)
+    extend = _invalidating(list.extend)
+    insert = _invalidating(list.insert)
+    pop = _invalidating(list.pop)
+    remove = _invalidating(list.remove)
+    clear = _invalidating(list.clear)
+    reverse = _invalidating(list.reverse)
+    __setitem__ = _invalidating(list.__setitem__)
+    __delitem__ = _invalidating(list.__delitem__)
+    __iadd__ = _invalidating(list.__iadd__)
+    __imul__ = _invalidating(list.__imul__)
+
+    def sort(self, *, key: Optional[Callable[[T], Any]] = None, reverse: bool = False) -> None:
+        """
+        Sorts in place
+        """
+        self.invalidate()
+        super().sort(key=key, reverse=reverse)  # type: ignore
 
     @classmethod
     def get_generic_content(cls) -> type[T]:
@@ -423,6 +816,22 @@ class STFArray(Generic[T], List[T], STFObject, ABC):
         """
         return cls.__orig_bases__[0].__args__[0]  # type: ignore
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """
+        Specializes deserialize for the element type
+        """
+        try:
+            content = cls.get_generic_content()
+        except (AttributeError, IndexError):
+            content = None
+        # Still generic, e.g. class Base(STFArray[T])
+        if isinstance(content, type):
+            cls._read_element = _reader_for(cast(ConvertableTypes, content))
+            if "cacheable" not in vars(cls):
+                # Changes to the list itself are always seen, the elements are only trusted if they can't change or keep versions
+                cls.cacheable = not issubclass(content, STFObject) or content.immutable or content._caches
+        super().__init_subclass__(**kwargs)
+
     def __getattr__(self, item: Any) -> None:
         """
         Does nothing except for shut up pylint
@@ -435,27 +844,81 @@ class STFArray(Generic[T], List[T], STFObject, ABC):
         Deserialize array
         """
         header = cls.read_header(data)
-        num_elems = header.metadata.read_int(length=cls.max_elem_field_width)
-        result: Self = cls(tuple())
-        for _ in range(num_elems):
-            result.append(cast(T, data.deconvert(cls.get_generic_content(), *args, **kwargs)))
-        return cls(result)
+        num_elems = header.metadata.read_int(cls.max_elem_field_width)
+        content = cls.get_generic_content()
+        if not (args or kwargs) and issubclass(content, STFObject) and content.pack_format and not content.requires_header:
+            return cls(cast(Iterable[T], map(content.from_packed, data.read_packed(content.pack_format, num_elems))))
+        if not args and issubclass(content, int) and content is not bool and kwargs.keys() <= _INT_OPTIONS:
+            return cls(cast(Iterable[T], data.read_ints(num_elems, **kwargs)))
+        if not (args or kwargs) and content is bool and _BOOL_LENGTH == 1:
+            return cls([byte != 0 for byte in data.read(num_elems)])
+        read = cls._read_element or _reader_for(cast(ConvertableTypes, content))
+        return cls([cast(T, read(data, *args, **kwargs)) for _ in range(num_elems)])
 
     def data(self, *args: Any, **kwargs: Any) -> ByteStream:
         """
         Get array data
         """
-        result = ByteStream()
-        for item in self:
-            result.extend(ByteStream.convert(cast(Convertable, item), *args, **kwargs))
-        return result
+        content = self.get_generic_content()
+        if not (args or kwargs) and issubclass(content, STFObject) and content.pack_format and not content.requires_header:
+            return self.pack_data(content.pack_format)
+        if not args and issubclass(content, int) and content is not bool and kwargs.keys() <= _INT_OPTIONS:
+            result = ByteStream()
+            result.write_ints(cast(List[int], self), **kwargs)
+            return result
+        if not (args or kwargs) and content is bool and _BOOL_LENGTH == 1:
+            # A byte per bool, the same bytes write_bool would give each of them
+            return ByteStream.from_buffer(bytearray(map(bool, cast(List[bool], self))))
+        if not (args or kwargs) and issubclass(content, str) and _ZERO_TERMINATE:
+            # One encode for the whole array, the separators double as terminators
+            return ByteStream(("\0".join(cast(List[str], self)) + "\0").encode(_ENCODING) if self else b"")
+        if issubclass(content, STFObject):
+            # Joins every element's header and data views straight into the result, no stream per element
+            return ByteStream.concat(*chain.from_iterable(
+                (part for part in STFObject._parts(item) if part is not None) for item in cast(Iterable[STFObject], self)
+            ))
+        return ByteStream.concat(*[ByteStream.convert(cast(Convertable, item), *args, **kwargs) for item in self])
+
+    def _cache_filled(self) -> None:
+        """
+        Remembers the element versions the cached data was computed from, when they can change
+        """
+        content = self.get_generic_content()
+        if issubclass(content, STFObject) and not content.immutable:
+            object.__setattr__(self, "_child_versions", list(map(_cache_version, self)))
+
+    def _refresh_cache(self) -> None:
+        """
+        Elements can be changed in place without the array seeing it, so compare their versions with the cached ones, and
+        drop the cache whenever an element has no version to compare
+        """
+        versions = self._child_versions
+        if versions is None or self._cached_data is None:
+            return
+        # Decided by the element type, nested arrays are the elements that can have their own elements changed
+        if issubclass(self.get_generic_content(), STFArray):
+            for item in cast(Iterable[STFArray[Any]], self):
+                STFArray._refresh_cache(item)
+        # Nothing built from an element without a version can be trusted
+        if not all(map(any, map(_keeps_version, self))) or list(map(_cache_version, self)) != versions:
+            self.invalidate()
+
+    def pack_data(self, pack_format: str) -> ByteStream:
+        """
+        Packs every element with one struct call instead of converting them one by one
+        """
+        packer = struct.Struct(Utility.struct_byteorder() + pack_format * len(self))
+        # Allocated at its final size and packed in place, the stream takes it over without copying
+        buffer = bytearray(packer.size)
+        packer.pack_into(buffer, 0, *chain.from_iterable(item.pack_values() for item in cast(Iterable[STFObject], self)))
+        return ByteStream.from_buffer(buffer)
 
     def metadata(self) -> ByteStream:
         """
         Metadata includes number of elements
         """
         result = ByteStream()
-        result.add_obj(len(self), length=self.max_elem_field_width)
+        result.write_int(len(self), Configuration.ENDIANNESS, self.max_elem_field_width)
         return result
 
 
@@ -471,6 +934,9 @@ class SerializedTreeFile:
         self.filename = filename
         self.mode = mode + 'b'
         self.file: BinaryIO
+        self.maps: List[mmap.mmap] = []
+        # Stream left over from reading a file that can't be mapped or seeked, it holds whatever it read ahead
+        self.stream: Optional[ByteStream] = None
 
     def __enter__(self) -> "SerializedTreeFile":
         """
@@ -482,42 +948,51 @@ class SerializedTreeFile:
 
     def __exit__(self, exc_type: Type[BaseException], exc_val: BaseException, exc_tb: TracebackType) -> None:
         """
-        Closes files
+        Closes files, streams from map() are no longer usable after this, what was read() out of them is a copy
         """
+        for mapped in self.maps:
+            mapped.close()
+        self.maps.clear()
         self.file.close()
 
     def write(self, obj: STFObject, *args: Any, **kwargs: Any) -> None:
         """
         Writes to file
         """
-        data = ByteStream()
-        data.write_int(Configuration.MAGIC, length=4)
-        data.write_int(Configuration.VERSION, length=4)
-        data.write(obj.serialize(*args, **kwargs))
-        self.file.write(data.get_bytes())
+        self.file.write(_FILE_HEADER.pack(Configuration.MAGIC, Configuration.VERSION))
+        obj.serialize_into(self.file, *args, **kwargs)
 
     def read(self, target_type: Type[STFObject], *args: Any, **kwargs: Any) -> STFObject:
         """
         Reads object from file
         """
-        data = ByteStream(old_array=bytearray(self.file.read()))
-        magic = data.read_int(length=4)
-        version = data.read_int(length=4)
+        data = self.map()
+        seekable = bool(self.maps) or self.file.seekable()
+        start = self.file.tell() if seekable else 0
+        magic, version = data.read_struct(_FILE_HEADER)
         if magic != Configuration.MAGIC:
             raise STFMagicNumberException()
         if not Utility.version_validation(version):
             raise STFVersionException()
-        return target_type.deserialize(data, *args, **kwargs)
-
-
-# Testing
-
-
-def main() -> None:
-    """
-    Entry point for testing
-    """
-
+        result = target_type.deserialize(data, *args, **kwargs)
+        if seekable:
+            # Leave the file just past the object like a plain read would
+            self.file.seek(start + data.position)
+        else:
+            # Can't give back what was read past the object, the next read carries on from the stream instead
+            self.stream = data
+        return result
 
-if __name__ == "__main__":
-    main()
+    def map(self) -> ByteStream:
+        """
+        Gets a stream over the rest of the file, memory mapped when the file supports it so nothing is copied
+        """
+        if self.stream is not None:
+            return self.stream
+        if not self.maps:
+            try:
+                self.maps.append(mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ))
+            except (OSError, ValueError):
+                # Not a real file or an empty one
+                return ByteStream.from_file(self.file)
+        return ByteStream.from_buffer(self.maps[-1], self.file.tell())
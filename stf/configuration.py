@@ -0,0 +1,43 @@
+#!/usr/bin/python3.11
+
+"""
+configuration.py
+"""
+
+# Imports
+from typing import Literal
+
+__all__ = ["Configuration"]
+
+
+# pylint: disable=too-few-public-methods
+class Configuration:
+    """
+    Stores relevant constants for the program, I hate magic numbers
+
+    Everything that shapes the encoding is read once when stf is imported (method defaults, precompiled structs and the
+    array fast paths), so change it here rather than at runtime. STRONG_HASH only picks what hash gets written and is
+    read on every call.
+    """
+    # Default length of boolean values in bytes
+    BOOL_LENGTH: int = 1
+    # Maximum length of metadata in bytes
+    METADATA_LENGTH: int = 3
+    # Default string encoding
+    ENCODING: str = "utf-8"
+    # Whether to zero terminate strings
+    ZERO_TERMINATE: bool = True
+    # Maximum size of a subfield in bytes
+    MAX_FIELD_SIZE: int = 4
+    # Parity of data
+    ENDIANNESS: Literal["little", "big"] = "big"
+    # Size of ints in bytes
+    INT_SIZE: int = 8
+    # Magic number for validation
+    MAGIC: int = 0xDEADBEEF
+    # Version
+    VERSION: int = 0x00000005
+    # Hash header data with sha256 instead of crc32, crc32 is plenty for catching corruption and much cheaper
+    STRONG_HASH: bool = False
+    # Bytes pulled from a file at a time by file backed ByteStreams
+    FILE_CHUNK_SIZE: int = 8192
@@ -0,0 +1,58 @@
+#!/usr/bin/python3.11
+
+"""
+exceptions.py
+"""
+
+# Imports
+from abc import ABC
+
+__all__ = ["STFBaseException", "STFCriticalException", "STFNonCriticalException", "STFUnboundStringException", "STFOverRead", "STFMagicNumberException", "STFVersionException", "STFInvalidTypeException"]
+
+
+class STFBaseException(Exception, ABC):
+    """
+    Base for the entire hierarchy of exceptions
+    """
+
+
+class STFNonCriticalException(STFBaseException, ABC):
+    """
+    Base for fixable errors
+    """
+
+
+class STFCriticalException(STFBaseException, ABC):
+    """
+    Base for severe errors
+    """
+
+
+class STFMagicNumberException(STFCriticalException):
+    """
+    Indicates bad magic number
+    """
+
+
+class STFVersionException(STFCriticalException):
+    """
+    Indicates wrong version
+    """
+
+
+class STFUnboundStringException(STFCriticalException):
+    """
+    Unterminated String
+    """
+
+
+class STFOverRead(STFCriticalException):
+    """
+    Read too many bytes
+    """
+
+
+class STFInvalidTypeException(STFCriticalException):
+    """
+    Invalid type for operation
+    """
@@ -0,0 +1,53 @@
+#!/usr/bin/python3.11
+
+"""
+utility.py
+"""
+
+# Imports
+from typing import Literal
+
+from stf.configuration import Configuration
+
+__all__ = ["Utility"]
+
+
+class Utility:
+    """
+    Stores utility functions
+    """
+
+    @staticmethod
+    def mask_bits(length: int) -> int:
+        """
+        Filters the lower 'length' bits of an int
+        """
+        return (1 << length) - 1
+
+    @staticmethod
+    def version_validation(version: int) -> bool:
+        """
+        Checks if versions are compatible
+        """
+        return version == Configuration.VERSION
+
+    @staticmethod
+    def struct_byteorder(byteorder: Literal["little", "big"] = Configuration.ENDIANNESS) -> str:
+        """
+        Gets the struct format prefix for a byteorder
+        """
+        return ">" if byteorder == "big" else "<"
+
+    @staticmethod
+    def encode_nibbles(first: int, second: int) -> int:
+        """
+        Sticks two small ints into a byte
+        """
+        return ((first & 0x0F) << 4) | (second & 0x0F)
+
+    @staticmethod
+    def decode_nibbles(num: int) -> tuple[int, int]:
+        """
+        Pulls two small ints out of a byte
+        """
+        return (num & 0xF0) >> 4, num & 0x0F
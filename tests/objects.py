@@ -0,0 +1,137 @@
+"""
+STFObjects the tests serialize
+"""
+
+# Imports
+from typing import Any
+
+import stf
+
+
+class StrArray(stf.STFArray[str]):
+    """
+    Array of strings
+    """
+
+
+class IntArray(stf.STFArray[int]):
+    """
+    Array of ints
+    """
+
+
+class BoolArray(stf.STFArray[bool]):
+    """
+    Array of bools
+    """
+
+
+class Leaf(stf.STFObject):
+    """
+    Holds one int, cacheable as assigning it is the only way it changes
+    """
+
+    cacheable = True
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+    @classmethod
+    def deserialize(cls, data: stf.ByteStream, *_: Any, **__: Any) -> "Leaf":
+        cls.read_header(data)
+        return cls(data.read_int())
+
+    def data(self, *_: Any, **__: Any) -> stf.ByteStream:
+        result = stf.ByteStream()
+        result.write_int(self.value)
+        return result
+
+    def metadata(self) -> stf.ByteStream:
+        return stf.ByteStream()
+
+
+class UncachedLeaf(Leaf):
+    """
+    Leaf that opts back out of caching, so it never bumps its version
+    """
+
+    cacheable = False
+
+
+class LeafArray(stf.STFArray[Leaf]):  # type: ignore
+    """
+    Array of leaves
+    """
+
+
+class Node(stf.STFObject):
+    """
+    Branch holding a leaf, its leaf can change without it seeing
+    """
+
+    def __init__(self, leaf: Leaf) -> None:
+        self.leaf = leaf
+
+    @classmethod
+    def deserialize(cls, data: stf.ByteStream, *_: Any, **__: Any) -> "Node":
+        cls.read_header(data)
+        return cls(Leaf.deserialize(data))
+
+    def data(self, *_: Any, **__: Any) -> stf.ByteStream:
+        return self.leaf.serialize()
+
+    def metadata(self) -> stf.ByteStream:
+        return stf.ByteStream()
+
+
+class Slotted(stf.STFObject):
+    """
+    Declares its own __slots__ without knowing about the cache
+    """
+
+    __slots__ = ("value",)
+    cacheable = True
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+    @classmethod
+    def deserialize(cls, data: stf.ByteStream, *_: Any, **__: Any) -> "Slotted":
+        cls.read_header(data)
+        return cls(data.read_int())
+
+    def data(self, *_: Any, **__: Any) -> stf.ByteStream:
+        result = stf.ByteStream()
+        result.write_int(self.value)
+        return result
+
+    def metadata(self) -> stf.ByteStream:
+        return stf.ByteStream()
+
+
+class Blob(stf.STFObject):
+    """
+    Keeps its data as the stream it was read into
+    """
+
+    def __init__(self, raw: stf.ByteStream) -> None:
+        self.raw = raw
+
+    @classmethod
+    def deserialize(cls, data: stf.ByteStream, *_: Any, **__: Any) -> "Blob":
+        header = cls.read_header(data)
+        return cls(data.read(header.size))
+
+    def data(self, *_: Any, **__: Any) -> stf.ByteStream:
+        return self.raw
+
+    def metadata(self) -> stf.ByteStream:
+        return stf.ByteStream()
+
+
+class RawBlob(Blob):
+    """
+    Blob serialized without a header, so serialize() is just its data
+    """
+
+    requires_header = False
@@ -0,0 +1,142 @@
+"""
+In memory round trips and serialization caching
+"""
+
+# Imports
+import unittest
+
+import deck
+import stf
+from tests.objects import BoolArray, RawBlob, IntArray, Leaf, LeafArray, Node, Slotted, StrArray, UncachedLeaf
+
+
+class TestRoundTrip(unittest.TestCase):
+    """
+    Serialized objects deserialize equal
+    """
+
+    def test_str_array(self) -> None:
+        """
+        Strings, including empty and non ascii ones
+        """
+        array = StrArray(["spam", "", "ünïcode"])
+        self.assertEqual(StrArray.deserialize(array.serialize()), array)
+        self.assertEqual(StrArray.deserialize(StrArray().serialize()), [])
+
+    def test_int_array(self) -> None:
+        """
+        Ints up to the full 8 bytes
+        """
+        array = IntArray([0, 1, 2 ** 64 - 1])
+        self.assertEqual(IntArray.deserialize(array.serialize()), array)
+
+    def test_bool_array(self) -> None:
+        """
+        Bools take a byte each and come back as bools
+        """
+        array = BoolArray([True, False, True])
+        result = BoolArray.deserialize(array.serialize())
+        self.assertEqual(result, array)
+        self.assertTrue(all(isinstance(item, bool) for item in result))
+        self.assertEqual(array.data(), b"\x01\x00\x01")
+
+    def test_read_bool(self) -> None:
+        """
+        Single bools read back from their byte, zero is False
+        """
+        data = stf.ByteStream(b"\x00\x01\x00")
+        self.assertIs(data.read_bool(), False)
+        self.assertIs(data.read_bool(), True)
+        self.assertIs(data.deconvert(bool), False)
+
+    def test_deck(self) -> None:
+        """
+        Decks of nibble packed cards
+        """
+        cards = deck.Deck.get_random()
+        self.assertEqual(deck.Deck.deserialize(cards.serialize()), cards)
+
+    def test_bytes_copy(self) -> None:
+        """
+        Deserializing from a copy of the bytes gives the same result as from the stream
+        """
+        array = IntArray([5, 6])
+        self.assertEqual(IntArray.deserialize(stf.ByteStream(array.serialize().get_bytes())), array)
+
+    def test_headerless_result(self) -> None:
+        """
+        Writing to what serialize() returned leaves the object's own data alone
+        """
+        raw = stf.ByteStream(b"raw")
+        result = RawBlob(raw).serialize()
+        result.write_int(7)
+        self.assertEqual(raw, b"raw")
+        self.assertEqual(RawBlob(raw).serialize(), b"raw")
+
+
+class TestCache(unittest.TestCase):
+    """
+    Cached serializations never go stale
+    """
+
+    def test_attribute_change(self) -> None:
+        """
+        Assigning an attribute of a cacheable object drops its cache
+        """
+        leaf = Leaf(1)
+        leaf.serialize()
+        leaf.value = 2
+        self.assertEqual(Leaf.deserialize(leaf.serialize()).value, 2)
+
+    def test_child_change(self) -> None:
+        """
+        Objects that aren't cacheable see changes to their children
+        """
+        leaf = Leaf(1)
+        node = Node(leaf)
+        node.serialize()
+        leaf.value = 2
+        self.assertEqual(Node.deserialize(node.serialize()).leaf.value, 2)
+
+    def test_element_change(self) -> None:
+        """
+        Arrays see their elements change, even after data() or serialize() with arguments
+        """
+        for serialize in (LeafArray.data, lambda array: array.serialize(unused=True)):
+            array = LeafArray([Leaf(1)])
+            array.serialize()
+            array[0].value = 2
+            serialize(array)
+            self.assertEqual(LeafArray.deserialize(array.serialize())[0].value, 2)
+
+    def test_uncached_element_change(self) -> None:
+        """
+        Arrays don't trust their cache for elements of a subclass that doesn't cache
+        """
+        array = LeafArray([UncachedLeaf(1)])
+        array.serialize()
+        array[0].value = 2
+        self.assertEqual(LeafArray.deserialize(array.serialize())[0].value, 2)
+
+    def test_list_change(self) -> None:
+        """
+        Modifying the list drops the array's cache
+        """
+        array = IntArray([1])
+        array.serialize()
+        array.append(2)
+        array[0] = 3
+        self.assertEqual(IntArray.deserialize(array.serialize()), [3, 2])
+
+    def test_slotted(self) -> None:
+        """
+        Classes with their own __slots__ work and just don't cache
+        """
+        slotted = Slotted(1)
+        slotted.serialize()
+        slotted.value = 2
+        self.assertEqual(Slotted.deserialize(slotted.serialize()).value, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Round trips through SerializedTreeFile
+"""
+
+# Imports
+import os
+import tempfile
+import threading
+import unittest
+
+import deck
+import stf
+from tests.objects import Blob, BoolArray, IntArray, StrArray
+
+
+class TestFileRoundTrip(unittest.TestCase):
+    """
+    Objects written to a file read back equal
+    """
+
+    def setUp(self) -> None:
+        handle, self.filename = tempfile.mkstemp(suffix=".stf")
+        os.close(handle)
+
+    def tearDown(self) -> None:
+        os.remove(self.filename)
+
+    def test_str_array(self) -> None:
+        """
+        Zero terminated strings are found in a memory mapped file
+        """
+        array = StrArray(["spam", "", "ünïcode"])
+        with stf.SerializedTreeFile(self.filename, "w") as file:
+            file.write(array)
+            file.write(StrArray(["eggs"]))
+        with stf.SerializedTreeFile(self.filename) as file:
+            self.assertEqual(file.read(StrArray), array)
+            self.assertEqual(file.read(StrArray), ["eggs"])
+
+    def test_arrays(self) -> None:
+        """
+        Int, bool and card arrays
+        """
+        ints, bools, cards = IntArray([0, 2 ** 64 - 1]), BoolArray([False, True]), deck.Deck.get_random()
+        with stf.SerializedTreeFile(self.filename, "w") as file:
+            file.write(ints)
+            file.write(bools)
+            file.write(cards)
+        with stf.SerializedTreeFile(self.filename) as file:
+            self.assertEqual(file.read(IntArray), ints)
+            self.assertEqual(file.read(BoolArray), bools)
+            self.assertEqual(file.read(deck.Deck), cards)
+
+    def test_read_outlives_file(self) -> None:
+        """
+        Bytes an object keeps from read() are still usable once the file is closed
+        """
+        with stf.SerializedTreeFile(self.filename, "w") as file:
+            file.write(Blob(stf.ByteStream(b"kept")))
+        with stf.SerializedTreeFile(self.filename) as file:
+            blob = file.read(Blob)
+        assert isinstance(blob, Blob)
+        self.assertEqual(blob.raw.get_bytes(), b"kept")
+        self.assertEqual(blob.serialize(), Blob(stf.ByteStream(b"kept")).serialize())
+
+    @unittest.skipUnless(hasattr(os, "mkfifo"), "needs named pipes")
+    def test_unmappable_file(self) -> None:
+        """
+        Objects after the first are still read when the file can't be mapped or seeked
+        """
+        os.remove(self.filename)
+        os.mkfifo(self.filename)
+
+        def write() -> None:
+            with stf.SerializedTreeFile(self.filename, "w") as file:
+                file.write(StrArray(["spam"]))
+                file.write(StrArray(["eggs", "ham"]))
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        with stf.SerializedTreeFile(self.filename) as file:
+            self.assertEqual(file.read(StrArray), ["spam"])
+            self.assertEqual(file.read(StrArray), ["eggs", "ham"])
+        writer.join()
+
+
+if __name__ == "__main__":
+    unittest.main()